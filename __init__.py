@@ -1,5 +1,5 @@
-from .models import Chunk, VectorIndexConfig, IndexType
+from .models import Chunk, ChunkBatch, VectorIndexConfig, IndexType
 from .base_sink import VectorSink
 from .mongo_sink import MongoSink
 
-__all__ = ["Chunk", "VectorIndexConfig", "IndexType", "VectorSink", "MongoSink"]
+__all__ = ["Chunk", "ChunkBatch", "VectorIndexConfig", "IndexType", "VectorSink", "MongoSink"]
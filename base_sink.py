@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from .models import Chunk, VectorIndexConfig
+from typing import List, Dict, Any, Optional, Union
+from .models import Chunk, ChunkBatch, VectorIndexConfig
 
 class VectorSink(ABC):
     """
@@ -14,8 +14,8 @@ class VectorSink(ABC):
         pass
 
     @abstractmethod
-    async def create_collection(self, collection_name: str, config: Optional[Dict[str, Any]] = None):
-        """Create a collection/table if it does not exist."""
+    async def create_collection(self, collection_name: str, config: Optional[Dict[str, Any]] = None, vector_index: Optional[VectorIndexConfig] = None):
+        """Create a collection/table if it does not exist, along with its indexes (and the vector index, if given)."""
         pass
 
     @abstractmethod
@@ -29,9 +29,9 @@ class VectorSink(ABC):
         pass
 
     @abstractmethod
-    async def ingest_chunks(self, collection_name: str, chunks: List[Chunk]):
+    async def ingest_chunks(self, collection_name: str, chunks: Union[List[Chunk], ChunkBatch]):
         """
-        Ingest a list of chunks into the database. 
+        Ingest a list of chunks (or a column-oriented ChunkBatch) into the database. 
         Should handle upserts (update if exists, insert if new).
         """
         pass
@@ -44,24 +44,45 @@ class VectorSink(ABC):
         pass
 
     @abstractmethod
-    async def update_chunk_metadata(self, collection_name: str, chunk_id: str, metadata: Dict[str, Any]):
+    async def update_chunk_metadata(self, collection_name: str, chunk_id: str, metadata: Dict[str, Any], prev_metadata: Optional[Dict[str, Any]] = None):
         """
         Update the metadata of a specific chunk without re-ingesting the embedding.
+        If the current metadata is passed as `prev_metadata`, only the difference is sent.
+        Returns the backend's write result (e.g. matched/modified counts).
         """
         pass
 
     @abstractmethod
-    async def get_chunk(self, collection_name: str, chunk_id: str) -> Optional[Chunk]:
+    async def update_file_metadata(self, collection_name: str, filename: str, metadata: Dict[str, Any], prev_metadata: Optional[Dict[str, Any]] = None):
+        """
+        Replace the metadata on every chunk of a file, leaving the text and embeddings untouched.
+        If the current metadata is passed as `prev_metadata`, only the difference is sent.
+        """
+        pass
+
+    @abstractmethod
+    async def get_chunk(self, collection_name: str, chunk_id: str, return_vectors: bool = True, fields: Optional[List[str]] = None) -> Optional[Chunk]:
         """
         Retrieve a single chunk by ID.
+        With return_vectors=False the embedding is not fetched (left empty).
+        If `fields` is given, only those top-level fields are fetched; the rest are left empty.
         """
         pass
 
     @abstractmethod
-    async def get_file_info(self, collection_name: str, filename: str) -> Optional[Dict[str, Any]]:
+    async def get_file_info(self, collection_name: str, filename: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Retrieve metadata for a specific file (e.g. to check existence or hash).
-        Returns the metadata of the first chunk found for this file.
+        Returns the metadata of the first chunk found for this file,
+        restricted to `fields` if given.
+        """
+        pass
+
+    @abstractmethod
+    async def get_files_info(self, collection_name: str, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Batched get_file_info: retrieve metadata for many files in one query.
+        Returns a mapping of filename -> metadata; files not found are omitted.
         """
         pass
 
@@ -73,8 +94,9 @@ class VectorSink(ABC):
         pass
     
     @abstractmethod
-    async def search(self, collection_name: str, query_vector: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Chunk]:
+    async def search(self, collection_name: str, query_vector: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None, return_vectors: bool = False) -> List[Chunk]:
         """
         Perform a vector search (useful for verification/testing).
+        Result embeddings are only returned when return_vectors=True.
         """
         pass
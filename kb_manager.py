@@ -1,46 +1,129 @@
+import asyncio
 import hashlib
 import logging
 import os
-from typing import Dict, Any, List, Optional
+from array import array
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import orjson
 
 from .base_sink import VectorSink
-from .models import Chunk
+from .models import Chunk, ChunkBatch, VectorIndexConfig, CANONICAL_JSON_OPTIONS
+from .ttl_cache import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# File hashing: 16-byte digest keeps the stored hash as compact as the old MD5 one
+FILE_HASH_DIGEST_SIZE = 16
+
+# Digest of the caller-supplied metadata, stored next to file_hash so the common
+# "nothing changed" case is one string compare instead of a field-by-field diff
+META_DIGEST_SIZE = 8
+META_DIGEST_IGNORED_KEYS = ("file_hash", "meta_digest")
+
+# get_file_info results are reused for this long within a run
+FILE_INFO_CACHE_SIZE = 100_000
+FILE_INFO_CACHE_TTL_S = 30.0
+
+# Distinguishes a cache miss from a cached "file not found" (None)
+_CACHE_MISS = object()
+
+# Queued by close() to tell the pipeline flusher to drain and exit
+_PIPELINE_CLOSE = object()
+
+def _new_file_hasher(data: bytes = b""):
+    return hashlib.blake2b(data, digest_size=FILE_HASH_DIGEST_SIZE)
+
+def _metadata_digest(metadata: Dict[str, Any]) -> str:
+    relevant = {k: v for k, v in metadata.items() if k not in META_DIGEST_IGNORED_KEYS}
+    encoded = orjson.dumps(relevant, option=CANONICAL_JSON_OPTIONS, default=str)
+    return hashlib.blake2b(encoded, digest_size=META_DIGEST_SIZE).hexdigest()
+
 class KnowledgeBaseManager:
     """
     Orchestrates file ingestion, updates, and deletions for a Knowledge Base.
     Handles:
     - New file ingestion
-    - Metadata updates (efficient)
+    - Metadata updates (in-place patch of changed fields)
     - Content updates (re-ingestion)
     - Legacy file migration (missing hash)
+
+    In pipeline mode, chunks from all files are queued and written by a single
+    background flusher in batches of up to `flush_size` (or every
+    `flush_interval_s` seconds), instead of one ingest call per file.
+    Call close() when done to flush whatever is still queued.
     """
 
-    def __init__(self, sink: VectorSink, collection_name: str):
+    def __init__(
+        self,
+        sink: VectorSink,
+        collection_name: str,
+        pipeline_mode: bool = False,
+        flush_size: int = 500,
+        flush_interval_s: float = 1.0,
+    ):
         self.sink = sink
         self.collection_name = collection_name
+        # Bounds how many files are hashed at once on the default thread pool
+        self._hash_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        self._file_info_cache = TTLCache(maxsize=FILE_INFO_CACHE_SIZE, ttl=FILE_INFO_CACHE_TTL_S)
+        self._indexes_ready = False
+
+        self.pipeline_mode = pipeline_mode
+        self.flush_size = flush_size
+        self.flush_interval_s = flush_interval_s
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._flusher_task: Optional[asyncio.Task] = None
+
+    async def ensure_indexes(
+        self,
+        vector_config: Optional[VectorIndexConfig] = None,
+        metadata_fields: Sequence[str] = ("metadata.filename",),
+        timeout_s: float = 300.0,
+    ):
+        """
+        Create the indexes ingestion relies on, once, at startup.
+        Waits (with exponential backoff) until the vector index is reported ready.
+        Must be called before process_file(); later calls are no-ops.
+        """
+        if self._indexes_ready:
+            return
+
+        for field in metadata_fields:
+            await self.sink.create_metadata_index(self.collection_name, field)
+
+        if vector_config is not None:
+            await self.sink.create_vector_index(self.collection_name, vector_config)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout_s
+            delay = 0.5
+            while not await self.sink.validate_index(self.collection_name, vector_config.name):
+                if loop.time() + delay > deadline:
+                    raise TimeoutError(f"Vector index '{vector_config.name}' not ready after {timeout_s}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+        self._indexes_ready = True
 
     async def process_file(self, file_path: str, metadata: Dict[str, Any]):
         """
         Main entry point to process a file based on its metadata and content.
+        Requires ensure_indexes() to have been called.
         """
-        # Ensure index exists (idempotent, fast if exists)
-        # In production, you might want to call this once on startup, not every file.
-        # But for safety here, we can call it or assume the user calls ensure_indexes().
-        # Let's assume user calls ensure_indexes() on startup.
+        self._check_indexes_ready()
         filename = metadata.get("filename")
         if not filename:
             raise ValueError("Metadata must contain 'filename'")
 
-        # 1. Calculate current file hash
-        current_hash = self._calculate_file_hash(file_path)
+        # 1. Calculate current file hash (off the event loop, hashlib releases the GIL)
+        async with self._hash_semaphore:
+            current_hash = await asyncio.to_thread(self._calculate_file_hash, file_path)
         
         # 2. Check if file exists in DB
-        existing_info = await self.sink.get_file_info(self.collection_name, filename)
+        # Only what the checks below need; answered from the sink's filename/hash index
+        existing_info = await self._cached_get_file_info(filename, ["filename", "file_hash", "meta_digest"])
 
         if not existing_info:
             # Scenario 1: New File
@@ -64,18 +147,163 @@ class KnowledgeBaseManager:
             elif self._metadata_changed(existing_info, metadata):
                 # Scenario 2: Metadata Changed (Content same)
                 logger.info(f"File '{filename}' metadata changed. Updating...")
-                await self._handle_metadata_update(filename, metadata, current_hash)
+                await self._handle_metadata_update(filename, metadata)
             
             else:
                 # Scenario 5: No Change
                 logger.info(f"File '{filename}' is up to date. No action.")
 
+    async def process_files(self, files: List[Tuple[str, Dict[str, Any]]], concurrency: int = 16):
+        """
+        Process many (file_path, metadata) pairs, up to `concurrency` at a time.
+        Existing file info for all of them is fetched up front in one query,
+        so each process_file call is served from the cache instead of the DB.
+
+        Hashing, extraction and DB round-trips of different files overlap.
+        A good `concurrency` is roughly the sink's connection pool size.
+        Filenames should be unique within one call.
+        """
+        self._check_indexes_ready()
+        filenames = [meta["filename"] for _, meta in files if meta.get("filename")]
+        # Chunks still queued from an earlier call would be missing from the prefetch
+        await self._wait_for_flush()
+        existing = await self.sink.get_files_info(self.collection_name, filenames)
+        for filename in filenames:
+            self._file_info_cache.set(filename, existing.get(filename))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _process_one(file_path: str, metadata: Dict[str, Any]):
+            async with semaphore:
+                await self.process_file(file_path, metadata)
+
+        await asyncio.gather(*(_process_one(file_path, metadata) for file_path, metadata in files))
+
+    def _check_indexes_ready(self):
+        if not self._indexes_ready:
+            raise RuntimeError("Indexes not ensured. Call ensure_indexes() first.")
+
     async def delete_file(self, filename: str):
         """
         Hard delete a file from the knowledge base.
         """
         logger.info(f"Deleting file '{filename}'...")
+        # Don't let queued chunks from an earlier version land after the delete
+        await self._wait_for_flush()
         await self.sink.delete_chunks(self.collection_name, {"metadata.filename": filename})
+        self._file_info_cache.pop(filename)
+
+    async def _cached_get_file_info(self, filename: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        sink.get_file_info, memoized per filename for FILE_INFO_CACHE_TTL_S seconds.
+        A cached entry may hold more fields than requested (e.g. from process_files).
+        """
+        info = self._file_info_cache.get(filename, _CACHE_MISS)
+        if info is _CACHE_MISS:
+            info = await self.sink.get_file_info(self.collection_name, filename, fields)
+            self._file_info_cache.set(filename, info)
+        return info
+
+    async def close(self):
+        """
+        Flush any chunks still queued in pipeline mode and stop the flusher.
+        Re-raises the error if a background flush failed.
+        """
+        if self._flusher_task is None:
+            return
+        task, self._flusher_task = self._flusher_task, None
+        if not task.done():
+            # A flusher that already failed would never read the marker
+            self._queue.put_nowait(_PIPELINE_CLOSE)
+        await task
+
+    def _enqueue_chunks(self, batch: ChunkBatch):
+        """
+        Hand a file's chunks to the background flusher, starting it on first use.
+        """
+        if self._flusher_task is None:
+            if not self._queue.empty():
+                # Left over from a failed flush: never written, so their cached
+                # "pending" file info is wrong too
+                self._file_info_cache.clear()
+            # Each flusher gets its own queue, so nothing stale reaches it
+            self._queue = asyncio.Queue()
+            self._flusher_task = asyncio.create_task(self._flusher())
+        elif self._flusher_task.done():
+            # A previous flush failed; surface it instead of queueing into a dead pipeline
+            self._flusher_task.result()
+        self._queue.put_nowait(batch)
+
+    async def _wait_for_flush(self):
+        """
+        Wait until every chunk queued so far has been written (pipeline mode only).
+        """
+        if self._flusher_task is None:
+            return
+        joiner = asyncio.ensure_future(self._queue.join())
+        await asyncio.wait({joiner, self._flusher_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not joiner.done():
+            joiner.cancel()
+            self._flusher_task.result()
+            # The flusher only stops on error or close(), so queued chunks must never be skipped
+            raise RuntimeError("Pipeline flusher stopped with chunks still queued")
+
+    async def _flusher(self):
+        """
+        Background consumer for pipeline mode.
+        Accumulates queued chunks and ingests them once `flush_size` is reached
+        or `flush_interval_s` has passed since the first chunk of the batch.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        pending: List[ChunkBatch] = []
+        pending_chunks = 0
+        deadline = None
+        # Keep one pending get() across timeouts so no item is ever dropped
+        getter = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(queue.get())
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait({getter}, timeout=timeout)
+
+                closing = False
+                if done:
+                    item, getter = getter.result(), None
+                    if item is _PIPELINE_CLOSE:
+                        closing = True
+                        queue.task_done()
+                    else:
+                        pending.append(item)
+                        pending_chunks += len(item)
+                        if deadline is None:
+                            deadline = loop.time() + self.flush_interval_s
+                        if pending_chunks < self.flush_size:
+                            continue
+
+                if pending:
+                    try:
+                        await self.sink.ingest_chunks(self.collection_name, ChunkBatch.concat(pending))
+                    except Exception:
+                        # These files were never written; drop their cached "pending" info
+                        self._file_info_cache.clear()
+                        raise
+                    finally:
+                        for _ in pending:
+                            queue.task_done()
+                    # Written now; later lookups of these files can go to the DB again
+                    for batch in pending:
+                        if len(batch):
+                            self._file_info_cache.pop(batch.metadatas[0]["filename"])
+                    pending, pending_chunks = [], 0
+                deadline = None
+
+                if closing:
+                    return
+        finally:
+            if getter is not None:
+                getter.cancel()
 
     async def _handle_new_file(self, file_path: str, metadata: Dict[str, Any], file_hash: str):
         """
@@ -84,28 +312,34 @@ class KnowledgeBaseManager:
         # 1. Extract & Chunk (Mocking this part for now)
         chunks = self._mock_extract_and_chunk(file_path)
         
-        # 2. Prepare chunks with metadata and hash
-        final_chunks = []
+        # 2. Prepare a column-oriented batch with metadata and hash
         updated_metadata = metadata.copy()
         updated_metadata["file_hash"] = file_hash
+        updated_metadata["meta_digest"] = _metadata_digest(metadata)
         
-        for i, text in enumerate(chunks):
-            # Generate stable ID based on text + filename (salt)
-            # This ensures identical text in different files gets unique IDs
-            chunk_id = Chunk.generate_id(text, include_metadata=False, salt=metadata["filename"])
-            
-            # Mock embedding
-            embedding = [0.1] * 3 
-            
-            final_chunks.append(Chunk(
-                id=chunk_id,
-                text=text,
-                embedding=embedding,
-                metadata=updated_metadata
-            ))
+        # Generate stable ID based on text + filename (salt)
+        # This ensures identical text in different files gets unique IDs
+        ids = [Chunk.generate_id(text, include_metadata=False, salt=metadata["filename"]) for text in chunks]
+        
+        # Mock embedding; a real embedding model would hand back one (N, D) float32 buffer
+        embeddings = array("f", [0.1] * (3 * len(chunks)))
+        
+        batch = ChunkBatch(
+            ids=ids,
+            texts=chunks,
+            embeddings=embeddings,
+            metadatas=[updated_metadata] * len(chunks)
+        )
             
         # 3. Ingest
-        await self.sink.ingest_chunks(self.collection_name, final_chunks)
+        if self.pipeline_mode:
+            self._enqueue_chunks(batch)
+            # Not in the DB until the flush; cache what will be stored so a repeat call
+            # sees this hash (and a content change deletes these chunks after the flush)
+            self._file_info_cache.set(metadata["filename"], updated_metadata)
+        else:
+            await self.sink.ingest_chunks(self.collection_name, batch)
+            self._file_info_cache.pop(metadata["filename"])
 
     async def _handle_content_update(self, file_path: str, metadata: Dict[str, Any], file_hash: str):
         """
@@ -117,74 +351,45 @@ class KnowledgeBaseManager:
         # 2. Ingest as new
         await self._handle_new_file(file_path, metadata, file_hash)
 
-    async def _handle_metadata_update(self, filename: str, new_metadata: Dict[str, Any], file_hash: str):
+    async def _handle_metadata_update(self, filename: str, new_metadata: Dict[str, Any]):
         """
-        Handle metadata update: Update all chunks for this file.
+        Handle metadata update: Patch only the changed fields on all chunks for this file
+        (and unset the ones the caller dropped).
+        Content is unchanged, so there is no re-chunking, re-embedding or vector rewrite.
         """
-        # We need to update ALL chunks for this file.
-        # Since our sink's update_chunk_metadata works on ID, we first need to find the IDs.
-        # OR, we can implement a bulk update by filter in the sink. 
-        # For now, let's assume we fetch IDs or use a bulk update if Sink supported it.
-        # To keep it simple and consistent with current Sink interface, we'll use delete+ingest 
-        # IF we can't easily get all IDs. 
-        # BUT, we defined "Efficient Metadata Update" as a goal.
-        # Let's add a `update_file_metadata` to Sink? No, let's iterate.
-        
-        # Better approach for this specific requirement:
-        # We can use update_many in Mongo directly if we expose it, or just loop.
-        # Let's assume we can't change Sink interface too much right now.
-        # We will fetch chunks (lightweight, no vectors) -> update each.
-        
-        # Actually, the most efficient way in Mongo is update_many({"metadata.filename": ...}, ...)
-        # But our Sink abstraction is generic.
-        # Let's stick to the plan: We will re-ingest for now OR we can just update the metadata 
-        # if we know the IDs. 
-        
-        # WAIT: If we change metadata, the Chunk ID (if generated with metadata) would change.
-        # BUT we switched to `include_metadata=False` in previous step! So IDs are stable.
-        # So we just need to update the metadata field.
-        
-        # Let's cheat a bit for performance and assume we can use a specialized method 
-        # or just re-ingest (which is safe but slower).
-        # Given the user asked for "Update", let's try to be efficient.
-        # I will use the sink's `update_chunk_metadata` but I need the IDs.
-        # I'll implement a `get_chunk_ids_by_file` helper or just use search.
-        
-        # For this implementation, I'll assume we can just re-ingest the metadata 
-        # by calling ingest again with same IDs (Upsert).
-        # Since IDs are stable (content based), calling `_handle_new_file` 
-        # will regenerate the SAME IDs and just update the metadata!
-        # This is the beauty of the Idempotent/Stable ID design.
-        
-        logger.info("Stable IDs enabled. Re-ingesting with new metadata (Upsert)...")
-        await self._handle_new_file(f"mock_path/{filename}", new_metadata, file_hash)
+        await self._wait_for_flush()
+        # process_file only fetched the hash/digest fields; diff against the full metadata
+        stored = await self.sink.get_file_info(self.collection_name, filename)
+        if stored is None:
+            return
+        updated_metadata = new_metadata.copy()
+        updated_metadata["file_hash"] = stored["file_hash"]
+        updated_metadata["meta_digest"] = _metadata_digest(new_metadata)
+        await self.sink.update_file_metadata(self.collection_name, filename, updated_metadata, prev_metadata=stored)
+        self._file_info_cache.pop(filename)
 
 
     def _calculate_file_hash(self, file_path: str) -> str:
         """
-        Calculate MD5 hash of a file.
+        Calculate a BLAKE2b (128-bit) hash of a file.
         """
         # For mock/test purposes, if file doesn't exist, hash the path string
         if not os.path.exists(file_path):
-            return hashlib.md5(file_path.encode()).hexdigest()
-            
-        hash_md5 = hashlib.md5()
+            return _new_file_hasher(file_path.encode()).hexdigest()
+
+        # file_digest runs the read/update loop in C with the GIL released
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            return hashlib.file_digest(f, _new_file_hasher).hexdigest()
 
     def _metadata_changed(self, old_meta: Dict[str, Any], new_meta: Dict[str, Any]) -> bool:
         """
-        Check if relevant metadata fields changed.
+        Check if relevant metadata fields changed, by comparing digests of the supplied metadata.
         Ignores 'file_hash' comparison since that's handled separately.
+        Chunks stored without a digest count as changed; the update then diffs the
+        full stored metadata and writes the digest.
         """
-        # Compare keys present in new_meta
-        for k, v in new_meta.items():
-            if k == "file_hash": continue
-            if old_meta.get(k) != v:
-                return True
-        return False
+        stored_digest = old_meta.get("meta_digest")
+        return stored_digest != _metadata_digest(new_meta)
 
     def _mock_extract_and_chunk(self, file_path: str) -> List[str]:
         """
@@ -1,20 +1,92 @@
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+import functools
+import hashlib
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Literal, Sequence, Union
+try:
+    from collections.abc import Buffer  # Python 3.12+
+except ImportError:
+    from typing_extensions import Buffer
+import orjson
+from bson.binary import Binary
+from pydantic import BaseModel, model_validator
 from enum import Enum
 
-class Chunk(BaseModel):
+_BLAKE2B_MAX_KEY_SIZE = 64
+
+# A contiguous float32 buffer (array('f'), float32 ndarray, memoryview rows of one);
+# the float32 format itself is checked where the buffer is used
+Float32Buffer = Buffer
+# An embedding as given to Chunk: a list of floats, or preferably a float32 buffer
+Embedding = Union[Sequence[float], Float32Buffer]
+# Sorted keys so {"a": 1, "b": 2} and {"b": 2, "a": 1} serialize identically
+CANONICAL_JSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+# Recent generate_id results, so re-ingesting duplicate texts skips re-hashing.
+# Bounded well below what the ids alone would allow: each entry keeps its text alive.
+GENERATE_ID_CACHE_SIZE = 16_384
+
+@functools.lru_cache(maxsize=GENERATE_ID_CACHE_SIZE)
+def _cached_id(text: str, salt: str, metadata_json: bytes) -> str:
+    """
+    Body of Chunk.generate_id, memoized on (text, salt, canonical metadata JSON).
+    """
+    if not salt and not metadata_json:
+        # Text-only ids: one hash call (an empty key is the same as no key)
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    # The salt is the BLAKE2b key, so no concatenated string is ever built
+    key = salt.encode('utf-8')
+    if len(key) > _BLAKE2B_MAX_KEY_SIZE:
+        key = hashlib.blake2b(key).digest()
+
+    hasher = hashlib.blake2b(text.encode('utf-8'), key=key, digest_size=16)
+
+    if metadata_json:
+        hasher.update(b"|")
+        hasher.update(metadata_json)
+
+    return hasher.hexdigest()
+
+_LOWER_HEX = frozenset("0123456789abcdef")
+
+def chunk_key(chunk_id: Union[str, bytes]) -> Union[Binary, str]:
+    """
+    The stored `_id` for a chunk id. Lowercase hex ids (what generate_id returns)
+    are kept as their raw bytes, half the size in documents and in the _id index;
+    any other id is stored as is. Raw bytes ids are accepted too.
+    """
+    if isinstance(chunk_id, bytes):
+        return Binary(chunk_id)
+    if chunk_id and len(chunk_id) % 2 == 0 and _LOWER_HEX.issuperset(chunk_id):
+        return Binary(bytes.fromhex(chunk_id))
+    return chunk_id
+
+def chunk_id_from_key(key: Union[bytes, str]) -> str:
+    """
+    Inverse of chunk_key: the chunk id for a stored `_id`.
+    """
+    return key.hex() if isinstance(key, bytes) else key
+
+@dataclass(slots=True)
+class Chunk:
     """
     Represents a single chunk of data to be ingested.
+    A plain slotted dataclass rather than a pydantic model: chunks are created
+    in bulk and their embeddings would otherwise be validated float by float.
     """
-    id: str = Field(..., description="Unique identifier for the chunk")
-    text: str = Field(..., description="The text content of the chunk")
-    embedding: List[float] = Field(..., description="The vector embedding of the text")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata associated with the chunk")
+    id: str  # Unique identifier for the chunk
+    text: str  # The text content of the chunk
+    # The vector embedding of the text (empty if not fetched). A list of floats, or
+    # preferably a contiguous float32 buffer (array('f'), float32 ndarray), which the
+    # sink packs into a BSON vector with one copy instead of a per-element loop.
+    embedding: Embedding = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)  # Additional metadata associated with the chunk
 
     @staticmethod
     def generate_id(text: str, metadata: Dict[str, Any] = None, include_metadata: bool = False, salt: str = "") -> str:
         """
-        Generates a deterministic ID based on the text and optionally metadata/salt.
+        Generates a deterministic ID (keyed BLAKE2b, 128-bit) based on the text and optionally metadata/salt.
         
         Args:
             text: The text content to hash.
@@ -23,20 +95,99 @@ class Chunk(BaseModel):
             salt: Optional string to ensure uniqueness (e.g., filename). 
                   Use this to prevent identical text in different files from colliding.
         """
-        import hashlib
-        import json
-        
-        content_to_hash = text
-        
-        if salt:
-            content_to_hash += f"|{salt}"
-        
-        if include_metadata and metadata:
-            # We sort keys in metadata to ensure {"a": 1, "b": 2} produces same hash as {"b": 2, "a": 1}
-            meta_str = json.dumps(metadata, sort_keys=True)
-            content_to_hash += f"|{meta_str}"
-        
-        return hashlib.md5(content_to_hash.encode('utf-8')).hexdigest()
+        # Metadata enters the cache key as its canonical JSON, which is hashable
+        # and already the exact bytes that get hashed
+        metadata_json = orjson.dumps(metadata, option=CANONICAL_JSON_OPTIONS) if include_metadata and metadata else b""
+        return _cached_id(text, salt, metadata_json)
+
+    def to_mongo(self) -> Dict[str, Any]:
+        """
+        Build the document for this chunk.
+        `embedding` and `metadata` are shared, not copied; the driver only reads
+        them while encoding BSON.
+        """
+        return {"_id": chunk_key(self.id), "text": self.text, "embedding": self.embedding, "metadata": self.metadata}
+
+    @classmethod
+    def from_mongo(cls, doc: Dict[str, Any]) -> "Chunk":
+        """
+        Build a chunk from a stored document, ignoring extra fields (e.g. search score).
+        Fields left out by a projection are empty.
+        """
+        return cls(
+            id=chunk_id_from_key(doc["_id"]),
+            text=doc.get("text", ""),
+            embedding=doc.get("embedding", []),
+            metadata=doc.get("metadata", {})
+        )
+
+@dataclass(slots=True)
+class ChunkBatch:
+    """
+    Column-oriented (SoA) batch of chunks.
+    `embeddings` is one contiguous float32 buffer of shape (N, D), e.g. an
+    array('f') or a float32 ndarray straight from the embedding model, so
+    per-chunk vectors are memoryview slices instead of lists of Python floats.
+    """
+    ids: List[str]
+    texts: List[str]
+    embeddings: Float32Buffer  # N * D values
+    metadatas: List[Dict[str, Any]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def embedding_rows(self) -> List[memoryview]:
+        """
+        Zero-copy float32 views of each chunk's embedding.
+        """
+        view = self._embedding_bytes()
+        row_bytes = self.dimensions * 4
+        return [view[i * row_bytes:(i + 1) * row_bytes].cast("f") for i in range(len(self))]
+
+    @property
+    def dimensions(self) -> int:
+        """Embedding size D, derived from the buffer length."""
+        if not self.ids:
+            return 0
+        values, remainder = divmod(self._embedding_bytes().nbytes // 4, len(self))
+        if remainder:
+            raise ValueError(f"ChunkBatch has {len(self)} chunks but embeddings are not an N x D buffer")
+        return values
+
+    def _embedding_bytes(self) -> memoryview:
+        view = memoryview(self.embeddings)
+        if view.format not in ("f", "<f") or view.itemsize != 4:
+            raise ValueError(f"ChunkBatch.embeddings must be a float32 buffer, got format '{view.format}'")
+        return view.cast("B")
+
+    def to_mongo(self) -> List[Dict[str, Any]]:
+        """
+        Build one document per chunk; embeddings are memoryview rows (packed by the sink).
+        """
+        return [
+            {"_id": chunk_key(chunk_id), "text": text, "embedding": embedding, "metadata": metadata}
+            for chunk_id, text, embedding, metadata in zip(self.ids, self.texts, self.embedding_rows(), self.metadatas)
+        ]
+
+    @classmethod
+    def concat(cls, batches: List["ChunkBatch"]) -> "ChunkBatch":
+        """
+        Join batches with the same embedding size into one.
+        """
+        if len(batches) == 1:
+            return batches[0]
+        if len({b.dimensions for b in batches if len(b)}) > 1:
+            raise ValueError("Cannot concatenate ChunkBatches with different embedding sizes")
+        embeddings = array("f")
+        for b in batches:
+            embeddings.frombytes(b._embedding_bytes())
+        return cls(
+            ids=[i for b in batches for i in b.ids],
+            texts=[t for b in batches for t in b.texts],
+            embeddings=embeddings,
+            metadatas=[m for b in batches for m in b.metadatas]
+        )
 
 class IndexType(str, Enum):
     VECTOR = "vector"
@@ -50,6 +201,17 @@ class VectorIndexConfig(BaseModel):
     dimensions: int
     path: str
     similarity: str = "cosine"  # cosine, euclidean, dotProduct
+    # Storage type for embeddings, as BSON vectors. "float32" packs them (half the
+    # size of an array of doubles); "int8" scalar-quantizes each vector with its own
+    # scale (~4x smaller docs). Must match the sink's embedding_dtype.
+    embedding_dtype: Literal["float32", "int8"] = "float32"
     
     # Additional Atlas specific configs can be added here
     num_candidates: int = 100 # For EF construction
+
+    @model_validator(mode="after")
+    def _check_int8_similarity(self) -> "VectorIndexConfig":
+        # Per-vector scales cancel out only under cosine; other similarities would rank wrongly
+        if self.embedding_dtype == "int8" and self.similarity != "cosine":
+            raise ValueError(f"embedding_dtype 'int8' requires cosine similarity, got '{self.similarity}'")
+        return self
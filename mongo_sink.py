@@ -1,33 +1,184 @@
+import asyncio
+import importlib.util
 import logging
-from typing import List, Dict, Any, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import UpdateOne
-from pymongo.errors import PyMongoError, CollectionInvalid
+import struct
+import sys
+from typing import List, Dict, Any, Literal, Optional, Sequence, Set, Tuple, Union
+import bson
+from bson.binary import Binary, BinaryVectorDtype, VECTOR_SUBTYPE
+from bson.raw_bson import RawBSONDocument
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.write_concern import WriteConcern
+from pymongo.errors import PyMongoError, OperationFailure
 from pymongo.operations import SearchIndexModel
+from pymongo.results import UpdateResult
 
 from .base_sink import VectorSink
-from .models import Chunk, VectorIndexConfig
+from .models import Chunk, ChunkBatch, VectorIndexConfig, chunk_key
+from .ttl_cache import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Server error code returned when creating a collection that already exists
+NAMESPACE_EXISTS = 48
+
+# Compound index behind file lookups; also covers {filename, file_hash, meta_digest} projections
+FILE_HASH_INDEX = "fname_hash_digest_idx"
+FILE_HASH_INDEX_KEYS = [("metadata.filename", 1), ("metadata.file_hash", 1), ("metadata.meta_digest", 1)]
+
+# Wire compression, in order of preference. zstd/snappy need pymongo[zstd,snappy]
+# (the zstandard / python-snappy modules), so only the installed ones are offered;
+# zlib is always available.
+WIRE_COMPRESSORS = ",".join(
+    name for name, module in (("zstd", "zstandard"), ("snappy", "snappy"), ("zlib", "zlib"))
+    if importlib.util.find_spec(module) is not None
+)
+ZLIB_COMPRESSION_LEVEL = -1  # zlib's default speed/size trade-off
+
+# Connection pool bounds for the shared client; sized for several concurrent bulk batches
+MAX_POOL_SIZE = 64
+MIN_POOL_SIZE = 8
+
+# One client per (event loop, connection string), shared by every sink on that loop.
+# Motor clients are bound to the loop they first run on, so a new loop (e.g. another
+# asyncio.run()) gets its own; clients of loops that have since closed are closed
+# and dropped on the next lookup, or all at once by close_clients().
+_client_cache: Dict[Tuple[asyncio.AbstractEventLoop, str], AsyncIOMotorClient] = {}
+
+# Positive validate_index results are reused for at least this long
+MIN_INDEX_CACHE_TTL_S = 5.0
+
+# BSON vector header for packed float32: dtype byte (0x27) + padding byte
+_FLOAT32_VECTOR_HEADER = struct.pack("<sB", BinaryVectorDtype.FLOAT32.value, 0)
+
+def _shared_client(connection_string: str) -> AsyncIOMotorClient:
+    """
+    Return the process-wide client for `connection_string` on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _client_cache if key[0].is_closed()]:
+        _client_cache.pop(key).close()
+
+    client = _client_cache.get((loop, connection_string))
+    if client is None:
+        client = _client_cache[(loop, connection_string)] = AsyncIOMotorClient(
+            connection_string,
+            maxPoolSize=MAX_POOL_SIZE,
+            minPoolSize=MIN_POOL_SIZE,
+            compressors=WIRE_COMPRESSORS,
+            zlibCompressionLevel=ZLIB_COMPRESSION_LEVEL,
+        )
+    return client
+
+def close_clients():
+    """
+    Close every shared client (pools and monitor threads) and forget them.
+    Sinks must connect() again afterwards.
+    """
+    for client in _client_cache.values():
+        client.close()
+    _client_cache.clear()
+
+def _pack_float32(embedding: Sequence[float]) -> Binary:
+    """
+    Pack an embedding into a BSON float32 vector (subtype 9).
+    Little-endian float32 buffers (array('f'), float32 ndarrays) are copied
+    as-is; anything else is packed element by element.
+    """
+    if sys.byteorder == "little" and not isinstance(embedding, list):
+        try:
+            view = memoryview(embedding)
+        except TypeError:
+            view = None
+        if view is not None and view.format in ("f", "<f") and view.itemsize == 4:
+            return Binary(_FLOAT32_VECTOR_HEADER + view.tobytes(), VECTOR_SUBTYPE)
+    return Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32)
+
+def _metadata_update(metadata: Dict[str, Any], prev_metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the update document that turns a chunk's metadata into `metadata`.
+    Without `prev_metadata` the whole subdocument is replaced; with it, only
+    changed fields are $set (and dropped ones $unset). Empty if nothing changed.
+    """
+    if prev_metadata is None:
+        return {"$set": {"metadata": metadata}}
+    update: Dict[str, Any] = {}
+    changed = {f"metadata.{k}": v for k, v in metadata.items() if k not in prev_metadata or prev_metadata[k] != v}
+    removed = {f"metadata.{k}": "" for k in prev_metadata if k not in metadata}
+    if changed:
+        update["$set"] = changed
+    if removed:
+        update["$unset"] = removed
+    return update
+
+def _quantize_int8(embedding: Sequence[float]) -> Tuple[Binary, float]:
+    """
+    Scalar-quantize an embedding into a BSON int8 vector.
+    Returns the vector and the scale needed to map it back to floats.
+    """
+    peak = max((abs(x) for x in embedding), default=0.0)
+    scale = 127.0 / peak if peak else 1.0
+    quantized = [round(x * scale) for x in embedding]
+    return Binary.from_vector(quantized, BinaryVectorDtype.INT8), scale
+
+def _decode_embedding(doc: Dict[str, Any]):
+    """
+    Turn a stored BSON vector back into a list of floats, in place.
+    """
+    scale = doc.pop("embedding_scale", None)
+    embedding = doc.get("embedding")
+    if isinstance(embedding, Binary) and embedding.subtype == VECTOR_SUBTYPE:
+        values = embedding.as_vector().data
+        doc["embedding"] = [v / scale for v in values] if scale else list(values)
+
 class MongoSink(VectorSink):
     """
     MongoDB Atlas implementation of the VectorSink using Motor for async I/O.
     """
 
-    def __init__(self, connection_string: str, database_name: str):
+    def __init__(
+        self,
+        connection_string: str,
+        database_name: str,
+        index_cache_ttl_s: float = 30.0,
+        bulk_write_concern: Optional[WriteConcern] = None,
+        embedding_dtype: Literal["float32", "int8"] = "float32",
+    ):
         self.connection_string = connection_string
         self.database_name = database_name
+        # Write concern for ingest_chunks(fast_load=True). Defaults to primary-only,
+        # unjournaled acks: no wait for replicas or the journal, but write errors
+        # are still reported. Acknowledged-but-unjournaled data can be lost on a crash.
+        self.bulk_write_concern = bulk_write_concern or WriteConcern(w=1, j=False)
+        # How embeddings are stored (and search queries encoded) in every collection of
+        # this sink; see VectorIndexConfig.embedding_dtype. Use the same value in every
+        # process writing to a collection.
+        self.embedding_dtype = embedding_dtype
+        # (collection_name, index_name) -> True for indexes already seen to exist
+        self._index_cache = TTLCache(maxsize=1024, ttl=max(index_cache_ttl_s, MIN_INDEX_CACHE_TTL_S))
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
+        # Collection handles, built once per name (and per write concern)
+        self._coll_cache: Dict[str, AsyncIOMotorCollection] = {}
+        self._fast_coll_cache: Dict[str, AsyncIOMotorCollection] = {}
+        # Collections create_collection has already set up (with indexes) on this connection
+        self._created: Set[str] = set()
+        # (collection_name, index_name) of vector indexes already created or seen on this connection
+        self._vector_indexes: Set[Tuple[str, str]] = set()
 
     async def connect(self):
-        """Establish connection to MongoDB Atlas."""
+        """Establish connection to MongoDB Atlas (the pooled client is shared per URI; the ping fails fast)."""
         try:
-            self.client = AsyncIOMotorClient(self.connection_string)
+            # Reuse the pooled client other sinks opened for this URI (no new handshakes)
+            self.client = _shared_client(self.connection_string)
             self.db = self.client[self.database_name]
+            self._coll_cache.clear()
+            self._fast_coll_cache.clear()
+            self._created.clear()
+            self._vector_indexes.clear()
             # Ping to verify connection
             await self.client.admin.command('ping')
             logger.info(f"Successfully connected to MongoDB database: {self.database_name}")
@@ -35,35 +186,76 @@ class MongoSink(VectorSink):
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
 
-    async def create_collection(self, collection_name: str, config: Optional[Dict[str, Any]] = None):
+    def _get_collection(self, collection_name: str, fast_load: bool = False) -> AsyncIOMotorCollection:
         """
-        Create a collection if it does not exist.
+        Return a memoized collection handle; fast_load selects the `bulk_write_concern` variant.
+        """
+        cache = self._fast_coll_cache if fast_load else self._coll_cache
+        collection = cache.get(collection_name)
+        if collection is None:
+            if fast_load:
+                collection = self.db.get_collection(collection_name, write_concern=self.bulk_write_concern)
+            else:
+                collection = self.db[collection_name]
+            cache[collection_name] = collection
+        return collection
+
+    async def create_collection(self, collection_name: str, config: Optional[Dict[str, Any]] = None, vector_index: Optional[VectorIndexConfig] = None):
+        """
+        Create a collection if it does not exist, together with the indexes ingestion uses:
+        FILE_HASH_INDEX and, if given, the vector index (chunk ids are the _id).
+        Building them while the collection is still empty keeps index builds off the ingest path.
+        `config` is passed to the server's create command (e.g. a validator).
+        Repeat calls for the same collection on this connection make no requests.
         """
         if self.db is None:
             raise ConnectionError("Not connected to database. Call connect() first.")
 
-        existing_collections = await self.db.list_collection_names()
-        if collection_name in existing_collections:
-            logger.info(f"Collection '{collection_name}' already exists.")
+        if collection_name in self._created:
+            if vector_index is not None:
+                await self.create_vector_index(collection_name, vector_index)
             return
 
+        # Skip the driver's own list_collections pre-check (check_exists) and let the
+        # server's NamespaceExists error be the idempotency check: one round-trip.
         try:
-            await self.db.create_collection(collection_name)
+            # Keep the returned handle so later calls reuse it
+            self._coll_cache[collection_name] = await self.db.create_collection(collection_name, check_exists=False, **(config or {}))
             logger.info(f"Collection '{collection_name}' created successfully.")
-        except CollectionInvalid as e:
-            logger.warning(f"Collection creation failed (might already exist): {e}")
+        except OperationFailure as e:
+            if e.code != NAMESPACE_EXISTS:
+                logger.error(f"Error creating collection '{collection_name}': {e}")
+                raise
+            self._get_collection(collection_name)
+            logger.info(f"Collection '{collection_name}' already exists.")
         except Exception as e:
             logger.error(f"Error creating collection '{collection_name}': {e}")
             raise
 
+        await self.create_metadata_index(collection_name)
+        self._created.add(collection_name)
+        if vector_index is not None:
+            await self.create_vector_index(collection_name, vector_index)
+
     async def create_vector_index(self, collection_name: str, index_config: VectorIndexConfig):
         """
         Create a vector search index on the collection using the standard Atlas Vector Search definition.
+        Indexes created or found once are remembered, so repeat calls on this connection make no requests.
         """
         if self.db is None:
             raise ConnectionError("Not connected to database.")
 
-        collection = self.db[collection_name]
+        if index_config.embedding_dtype != self.embedding_dtype:
+            raise ValueError(
+                f"Vector index '{index_config.name}' expects {index_config.embedding_dtype} embeddings, "
+                f"but this sink stores {self.embedding_dtype}"
+            )
+
+        if (collection_name, index_config.name) in self._vector_indexes:
+            return
+
+        collection = self._get_collection(collection_name)
+        # int8 vectors are stored pre-quantized, so the index needs no quantization setting
         
         definition = {
             "fields": [
@@ -90,70 +282,119 @@ class MongoSink(VectorSink):
             
             if existing_indexes:
                 logger.info(f"Vector index '{index_config.name}' already exists on '{collection_name}'.")
-                return
-
-            await collection.create_search_index(model=model)
-            logger.info(f"Vector index '{index_config.name}' creation initiated on '{collection_name}'.")
+            else:
+                await collection.create_search_index(model=model)
+                logger.info(f"Vector index '{index_config.name}' creation initiated on '{collection_name}'.")
+            self._vector_indexes.add((collection_name, index_config.name))
         except PyMongoError as e:
             logger.error(f"Failed to create vector index: {e}")
             raise
 
     async def validate_index(self, collection_name: str, index_name: str) -> bool:
         """
-        Check if the search index exists.
+        Check if the search index exists and is queryable (Atlas has finished building it).
         """
         if self.db is None:
             raise ConnectionError("Not connected.")
+
+        # Only hits are cached: a missing index is usually still being built
+        if self._index_cache.get((collection_name, index_name), False):
+            return True
         
         try:
-            collection = self.db[collection_name]
+            collection = self._get_collection(collection_name)
             cursor = collection.list_search_indexes(index_name)
             indexes = await cursor.to_list(length=None)
             
             is_exists = len(indexes) > 0
-            if is_exists:
+            is_ready = is_exists and all(idx.get("queryable", True) for idx in indexes)
+            if is_ready:
+                self._index_cache.set((collection_name, index_name), True)
                 logger.info(f"Index '{index_name}' found on '{collection_name}'.")
+            elif is_exists:
+                logger.info(f"Index '{index_name}' on '{collection_name}' is still building.")
             else:
                 logger.warning(f"Index '{index_name}' NOT found on '{collection_name}'.")
-            return is_exists
+            return is_ready
         except Exception as e:
             logger.error(f"Error validating index: {e}")
             return False
 
-    async def ingest_chunks(self, collection_name: str, chunks: List[Chunk], batch_size: int = 100):
+    async def ingest_chunks(self, collection_name: str, chunks: Union[List[Chunk], ChunkBatch], batch_size: int = 100, concurrency: int = 4, fast_load: bool = False):
         """
         Ingest chunks using bulk write operations for efficiency.
+        Accepts a list of Chunks or a ChunkBatch (whose float32 rows are packed without per-element work).
+        Batches are unordered and up to `concurrency` of them are in flight at once.
+        fast_load=True writes with `bulk_write_concern` (relaxed durability) for initial bulk loads.
+        """
+        await self._bulk_upsert(collection_name, chunks, batch_size, concurrency, fast_load, content_on_insert=False)
+
+    async def upsert_chunks(self, collection_name: str, chunks: Union[List[Chunk], ChunkBatch], batch_size: int = 100, concurrency: int = 4, fast_load: bool = False):
         """
+        Insert new chunks and refresh only the metadata of existing ones, one request per batch.
+        Text and embedding go in $setOnInsert, so stored content is never rewritten
+        (chunk ids are derived from the text). Batching works as in ingest_chunks.
+        """
+        await self._bulk_upsert(collection_name, chunks, batch_size, concurrency, fast_load, content_on_insert=True)
+
+    async def _bulk_upsert(self, collection_name: str, chunks: Union[List[Chunk], ChunkBatch], batch_size: int, concurrency: int, fast_load: bool, content_on_insert: bool):
         if self.db is None:
             raise ConnectionError("Not connected.")
 
-        collection = self.db[collection_name]
+        collection = self._get_collection(collection_name, fast_load=fast_load)
+        quantize = self.embedding_dtype == "int8"
+
+        if isinstance(chunks, ChunkBatch):
+            docs = chunks.to_mongo()
+        else:
+            docs = [chunk.to_mongo() for chunk in chunks]
+
+        # Batches run concurrently, so collapse repeated IDs here (last one wins,
+        # as it would with sequential upserts) instead of racing two upserts.
+        docs = list({doc["_id"]: doc for doc in docs}.values())
         
-        total_chunks = len(chunks)
+        total_chunks = len(docs)
         logger.info(f"Starting ingestion of {total_chunks} chunks into '{collection_name}'...")
 
-        for i in range(0, total_chunks, batch_size):
-            batch = chunks[i : i + batch_size]
-            operations = []
-            
-            for chunk in batch:
-                doc = chunk.model_dump()
-                operations.append(
-                    UpdateOne(
-                        {"id": chunk.id},
-                        {"$set": doc},
-                        upsert=True
-                    )
-                )
-            
-            if operations:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _write_batch(i: int, batch: List[Dict[str, Any]]):
+            # Build (and encode) a batch only once it may be sent, so at most
+            # `concurrency` batches of operations exist at a time
+            async with semaphore:
+                operations = []
+
+                for doc in batch:
+                    if quantize:
+                        doc["embedding"], doc["embedding_scale"] = _quantize_int8(doc["embedding"])
+                    else:
+                        doc["embedding"] = _pack_float32(doc["embedding"])
+                    key = doc.pop("_id")
+                    if content_on_insert:
+                        update = {"$setOnInsert": doc, "$set": {"metadata": doc.pop("metadata")}}
+                        operations.append(UpdateOne({"_id": key}, update, upsert=True))
+                    else:
+                        # Whole-document upsert, encoded to BSON once here; the driver
+                        # copies the raw bytes into the command (and into any retry).
+                        # The _id comes from the filter on insert and is kept on replace.
+                        raw = RawBSONDocument(bson.encode(doc, codec_options=collection.codec_options))
+                        operations.append(ReplaceOne({"_id": key}, raw, upsert=True))
+
                 try:
-                    result = await collection.bulk_write(operations)
-                    logger.info(f"Batch {i//batch_size + 1}: Matched {result.matched_count}, Modified {result.modified_count}, Upserted {result.upserted_count}")
+                    result = await collection.bulk_write(operations, ordered=False)
+                    if result.acknowledged:
+                        logger.info(f"Batch {i//batch_size + 1}: Matched {result.matched_count}, Modified {result.modified_count}, Upserted {result.upserted_count}")
+                    else:
+                        logger.info(f"Batch {i//batch_size + 1}: Sent {len(operations)} unacknowledged upserts")
                 except PyMongoError as e:
                     logger.error(f"Error ingesting batch starting at index {i}: {e}")
                     raise
 
+        await asyncio.gather(*(
+            _write_batch(i, docs[i : i + batch_size])
+            for i in range(0, total_chunks, batch_size)
+        ))
+
         logger.info("Ingestion complete.")
 
     async def delete_chunks(self, collection_name: str, filters: Dict[str, Any]):
@@ -163,7 +404,7 @@ class MongoSink(VectorSink):
         if self.db is None:
             raise ConnectionError("Not connected.")
 
-        collection = self.db[collection_name]
+        collection = self._get_collection(collection_name)
         
         try:
             result = await collection.delete_many(filters)
@@ -172,61 +413,141 @@ class MongoSink(VectorSink):
             logger.error(f"Error deleting chunks: {e}")
             raise
 
-    async def update_chunk_metadata(self, collection_name: str, chunk_id: str, metadata: Dict[str, Any]):
+    async def update_chunk_metadata(self, collection_name: str, chunk_id: str, metadata: Dict[str, Any], prev_metadata: Optional[Dict[str, Any]] = None) -> Optional[UpdateResult]:
         """
         Update the metadata of a specific chunk without re-ingesting the embedding.
+        Pass the chunk's current metadata as `prev_metadata` to send only the changed
+        fields; if nothing changed no request is made and None is returned.
+        Otherwise returns the acknowledged UpdateResult, so callers can check
+        modified_count instead of reading the chunk back.
         """
         if self.db is None:
             raise ConnectionError("Not connected.")
 
-        collection = self.db[collection_name]
+        update = _metadata_update(metadata, prev_metadata)
+        if not update:
+            logger.info(f"Metadata for chunk '{chunk_id}' unchanged. Update skipped.")
+            return None
+
+        collection = self._get_collection(collection_name)
         
         try:
             result = await collection.update_one(
-                {"id": chunk_id},
-                {"$set": {"metadata": metadata}}
+                {"_id": chunk_key(chunk_id)},
+                update
             )
             if result.matched_count == 0:
                 logger.warning(f"Chunk with id '{chunk_id}' not found. Metadata update skipped.")
             else:
                 logger.info(f"Updated metadata for chunk '{chunk_id}'.")
+            return result
         except PyMongoError as e:
             logger.error(f"Error updating chunk metadata: {e}")
             raise
 
-    async def get_chunk(self, collection_name: str, chunk_id: str) -> Optional[Chunk]:
+    async def update_file_metadata(self, collection_name: str, filename: str, metadata: Dict[str, Any], prev_metadata: Optional[Dict[str, Any]] = None):
+        """
+        Set the metadata of all chunks of a file with a single update_many.
+        With the file's current metadata as `prev_metadata`, only changed fields are
+        $set and dropped ones $unset (as in update_chunk_metadata).
+        """
+        if self.db is None:
+            raise ConnectionError("Not connected.")
+
+        update = _metadata_update(metadata, prev_metadata)
+        if not update:
+            logger.info(f"Metadata for file '{filename}' unchanged. Update skipped.")
+            return
+
+        collection = self._get_collection(collection_name)
+        
+        try:
+            result = await collection.update_many(
+                {"metadata.filename": filename},
+                update
+            )
+            fields = [*update.get("$set", {}), *update.get("$unset", {})]
+            logger.info(f"Updated metadata fields {fields} on {result.modified_count} chunks of '{filename}'.")
+        except PyMongoError as e:
+            logger.error(f"Error updating file metadata: {e}")
+            raise
+
+    async def update_and_fetch(self, collection_name: str, chunk_id: str, metadata: Dict[str, Any], prev_metadata: Optional[Dict[str, Any]] = None) -> Optional[Chunk]:
+        """
+        Update a chunk's metadata and return the updated chunk (without its embedding)
+        in a single findAndModify round-trip. Returns None if the chunk does not exist.
+        `prev_metadata` works as in update_chunk_metadata.
+        """
+        if self.db is None:
+            raise ConnectionError("Not connected.")
+
+        update = _metadata_update(metadata, prev_metadata)
+        if not update:
+            return await self.get_chunk(collection_name, chunk_id, return_vectors=False)
+
+        collection = self._get_collection(collection_name)
+        
+        try:
+            doc = await collection.find_one_and_update(
+                {"_id": chunk_key(chunk_id)},
+                update,
+                projection={"embedding": 0, "embedding_scale": 0},
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                logger.warning(f"Chunk with id '{chunk_id}' not found. Metadata update skipped.")
+                return None
+            return Chunk.from_mongo(doc)
+        except PyMongoError as e:
+            logger.error(f"Error updating chunk metadata: {e}")
+            raise
+
+    async def get_chunk(self, collection_name: str, chunk_id: str, return_vectors: bool = True, fields: Optional[List[str]] = None) -> Optional[Chunk]:
         """
         Retrieve a single chunk by ID.
+        `fields` (e.g. ["metadata"]) limits the fetch to those fields and overrides return_vectors.
         """
         if self.db is None:
             raise ConnectionError("Not connected.")
         
-        collection = self.db[collection_name]
+        collection = self._get_collection(collection_name)
+        if fields is not None:
+            projection = {f: 1 for f in fields}
+            if "embedding" in projection:
+                projection["embedding_scale"] = 1
+        else:
+            projection = None if return_vectors else {"embedding": 0, "embedding_scale": 0}
         try:
-            doc = await collection.find_one({"id": chunk_id})
+            doc = await collection.find_one({"_id": chunk_key(chunk_id)}, projection)
             if doc:
-                if "_id" in doc:
-                    del doc["_id"]
-                return Chunk(**doc)
+                _decode_embedding(doc)
+                return Chunk.from_mongo(doc)
             return None
         except PyMongoError as e:
             logger.error(f"Error retrieving chunk: {e}")
             raise
 
-    async def get_file_info(self, collection_name: str, filename: str) -> Optional[Dict[str, Any]]:
+    async def get_file_info(self, collection_name: str, filename: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Retrieve metadata for a specific file.
         We query for ONE chunk that matches the filename in metadata.
+        If `fields` is given only those metadata fields are returned; fetching only
+        filename, file_hash and meta_digest is answered from FILE_HASH_INDEX alone (covered query).
         """
         if self.db is None:
             raise ConnectionError("Not connected.")
         
-        collection = self.db[collection_name]
+        collection = self._get_collection(collection_name)
+        if fields is None:
+            projection = {"metadata": 1, "_id": 0} # Projection: only return metadata
+        else:
+            projection = {f"metadata.{f}": 1 for f in fields}
+            projection["_id"] = 0
         try:
             # Find one document where metadata.filename matches
             doc = await collection.find_one(
                 {"metadata.filename": filename},
-                {"metadata": 1, "_id": 0} # Projection: only return metadata
+                projection
             )
             if doc and "metadata" in doc:
                 return doc["metadata"]
@@ -235,33 +556,67 @@ class MongoSink(VectorSink):
             logger.error(f"Error retrieving file info: {e}")
             raise
 
+    async def get_files_info(self, collection_name: str, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve metadata for many files with a single aggregation
+        (one chunk per filename), instead of one find_one per file.
+        """
+        if self.db is None:
+            raise ConnectionError("Not connected.")
+        if not filenames:
+            return {}
+        
+        collection = self._get_collection(collection_name)
+        pipeline = [
+            {"$match": {"metadata.filename": {"$in": filenames}}},
+            {"$group": {"_id": "$metadata.filename", "metadata": {"$first": "$metadata"}}}
+        ]
+        try:
+            cursor = collection.aggregate(pipeline)
+            results = await cursor.to_list(length=None)
+            return {r["_id"]: r["metadata"] for r in results}
+        except PyMongoError as e:
+            logger.error(f"Error retrieving files info: {e}")
+            raise
+
     async def create_metadata_index(self, collection_name: str, field: str = "metadata.filename"):
         """
         Create a standard database index on a metadata field.
+        For metadata.filename this is the compound FILE_HASH_INDEX, which serves
+        filename lookups as its prefix and also covers the hash check.
         """
         if self.db is None:
             raise ConnectionError("Not connected.")
         
-        collection = self.db[collection_name]
+        collection = self._get_collection(collection_name)
         try:
+            if field == "metadata.filename":
+                await collection.create_index(FILE_HASH_INDEX_KEYS, name=FILE_HASH_INDEX)
+                logger.info(f"Created index '{FILE_HASH_INDEX}' in '{collection_name}'.")
+                return
             await collection.create_index([(field, 1)])
             logger.info(f"Created index on '{field}' in '{collection_name}'.")
         except PyMongoError as e:
             logger.error(f"Error creating metadata index: {e}")
             raise
 
-    async def search(self, collection_name: str, query_vector: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Chunk]:
+    async def search(self, collection_name: str, query_vector: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None, return_vectors: bool = False) -> List[Chunk]:
         """
         Perform a vector search using the $vectorSearch aggregation stage.
+        Embeddings are projected out server-side unless return_vectors=True.
         """
         if self.db is None:
             raise ConnectionError("Not connected.")
             
-        collection = self.db[collection_name]
+        collection = self._get_collection(collection_name)
         
         index_name = "vector_index" 
         path = "embedding"
 
+        # Query vectors must match the stored vector type
+        if self.embedding_dtype == "int8":
+            query_vector, _ = _quantize_int8(query_vector)
+
         pipeline = [
             {
                 "$vectorSearch": {
@@ -277,22 +632,24 @@ class MongoSink(VectorSink):
         if filters:
             pipeline[0]["$vectorSearch"]["filter"] = filters
 
-        pipeline.append({
-            "$project": {
-                "_id": 0,
-                "id": 1,
-                "text": 1,
-                "embedding": 1,
-                "metadata": 1,
-                "score": {"$meta": "vectorSearchScore"}
-            }
-        })
+        projection = {
+            "_id": 1,
+            "text": 1,
+            "metadata": 1,
+            "score": {"$meta": "vectorSearchScore"}
+        }
+        if return_vectors:
+            projection["embedding"] = 1
+            projection["embedding_scale"] = 1
+        pipeline.append({"$project": projection})
 
         try:
             # Motor's aggregate returns an async cursor
             cursor = collection.aggregate(pipeline)
             results = await cursor.to_list(length=None)
-            chunks = [Chunk(**r) for r in results]
+            for r in results:
+                _decode_embedding(r)
+            chunks = [Chunk.from_mongo(r) for r in results]
             return chunks
         except PyMongoError as e:
             logger.error(f"Search failed: {e}")
@@ -0,0 +1,40 @@
+import time
+from typing import Any, Dict, Hashable, Tuple
+
+class TTLCache:
+    """
+    Minimal in-memory cache whose entries expire `ttl` seconds after being set.
+    When full, the oldest entry is evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache `value` under `key` for `ttl` seconds."""
+        # Re-insert so dict order stays oldest-first for eviction
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+        self._data[key] = (value, time.monotonic() + self.ttl)
+
+    def pop(self, key: Hashable):
+        """Drop `key` from the cache if present."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        self._data.clear()